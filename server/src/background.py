@@ -3,6 +3,9 @@ from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.base import BaseTrigger
 from apscheduler.triggers.date import DateTrigger
 
+# Default for `Trigger.misfireGraceTime`, where `None` already means "no grace limit"
+_UNSET = object()
+
 class Trigger:
     '''
     A class to define triggers for `APScheduler` based jobs.
@@ -24,17 +27,29 @@ class Trigger:
     
     ## Custom trigger
     customTrigger = Trigger(customAPTrigger=DateTrigger(run_date=(datetime.datetime.now() + datetime.timedelta(seconds=5))) # Custom APScheduler trigger
+    
+    ## Interval trigger that collapses missed runs into one and never overlaps itself
+    safeTrigger = Trigger(type='interval', seconds=30, coalesce=True, maxInstances=1)
     ```
+    
+    `coalesce`, `maxInstances` and `misfireGraceTime` are forwarded to APScheduler's `add_job` as `coalesce`, `max_instances` and `misfire_grace_time`.
+    Options left out are not passed at all, so APScheduler's own defaults (and any scheduler `job_defaults`) apply.
+    Pass `misfireGraceTime=None` explicitly to let a job run however late it starts.
     '''
     
-    def __init__(self, type='interval', seconds=None, minutes=None, hours=None, triggerDate: datetime.datetime=None, customAPTrigger: BaseTrigger=None) -> None:
+    __slots__ = ('type', 'immediate', 'seconds', 'minutes', 'hours', 'triggerDate', 'customAPTrigger', 'coalesce', 'maxInstances', 'misfireGraceTime')
+    
+    def __init__(self, type='interval', seconds=None, minutes=None, hours=None, triggerDate: datetime.datetime=None, customAPTrigger: BaseTrigger=None, coalesce: bool | None=None, maxInstances: int | None=None, misfireGraceTime: int | None=_UNSET) -> None:
         self.type = type
-        self.immediate = seconds == None and minutes == None and hours == None and triggerDate == None
-        self.seconds = seconds if seconds != None else 0
-        self.minutes = minutes if minutes != None else 0
-        self.hours = hours if hours != None else 0
+        self.immediate = seconds is None and minutes is None and hours is None and triggerDate is None
+        self.seconds = seconds or 0
+        self.minutes = minutes or 0
+        self.hours = hours or 0
         self.triggerDate = triggerDate
         self.customAPTrigger = customAPTrigger
+        self.coalesce = coalesce
+        self.maxInstances = maxInstances
+        self.misfireGraceTime = misfireGraceTime
 
 class AsyncProcessor:
     """
@@ -70,17 +85,23 @@ class AsyncProcessor:
     For trigger options, see the `Trigger` class.
     """
     
+    __slots__ = ('id', 'scheduler', 'logging')
+    
     def __init__(self, paused=False, logging=True) -> None:
         self.id = uuid.uuid4().hex
         self.scheduler = BackgroundScheduler()
         self.scheduler.start(paused=paused)
         self.logging = logging
         
-        self.log("Scheduler initialised in {} mode.".format("paused" if paused else "active"))
+        self.log("Scheduler initialised in {} mode.", "paused" if paused else "active")
         
-    def log(self, message):
-        if self.logging == True:
-            print("ASYNCPROCESSOR: {}: {}".format(self.id, message))
+    def log(self, message, *args):
+        if not self.logging:
+            return
+        
+        if args:
+            message = message.format(*args)
+        print("ASYNCPROCESSOR: {}: {}".format(self.id, message))
     
     def shutdown(self):
         self.scheduler.shutdown()
@@ -100,19 +121,28 @@ class AsyncProcessor:
         """
         if trigger == None: trigger = Trigger()
         
+        fname = function.__name__
+        options = {}
+        if trigger.misfireGraceTime is not _UNSET:
+            options["misfire_grace_time"] = trigger.misfireGraceTime
+        if trigger.coalesce is not None:
+            options["coalesce"] = trigger.coalesce
+        if trigger.maxInstances is not None:
+            options["max_instances"] = trigger.maxInstances
+        
         job = None
         if trigger.customAPTrigger != None:
-            job = self.scheduler.add_job(function, trigger.customAPTrigger, args=args, kwargs=kwargs, misfire_grace_time=None)
-            self.log("Job for '{}' added with custom trigger.".format(function.__name__))
+            job = self.scheduler.add_job(function, trigger.customAPTrigger, args=args, kwargs=kwargs, **options)
+            self.log("Job for '{}' added with custom trigger.", fname)
         elif trigger.immediate:
-            job = self.scheduler.add_job(function, args=args, kwargs=kwargs, misfire_grace_time=None)
-            self.log("Job for '{}' added with immediate trigger.".format(function.__name__))
+            job = self.scheduler.add_job(function, args=args, kwargs=kwargs, **options)
+            self.log("Job for '{}' added with immediate trigger.", fname)
         elif trigger.type == "date":
-            job = self.scheduler.add_job(function, DateTrigger(run_date=trigger.triggerDate), args=args, kwargs=kwargs, misfire_grace_time=None)
-            self.log("Job for '{}' added with trigger date: {}.".format(function.__name__, trigger.triggerDate.isoformat()))
+            job = self.scheduler.add_job(function, DateTrigger(run_date=trigger.triggerDate), args=args, kwargs=kwargs, **options)
+            self.log("Job for '{}' added with trigger date: {}.", fname, trigger.triggerDate.isoformat())
         else:
-            job = self.scheduler.add_job(function, 'interval', seconds=trigger.seconds, minutes=trigger.minutes, hours=trigger.hours, args=args, kwargs=kwargs, misfire_grace_time=None)
-            self.log("Job for '{}' added with trigger: {} seconds, {} minutes, {} hours.".format(function.__name__, trigger.seconds, trigger.minutes, trigger.hours))
+            job = self.scheduler.add_job(function, 'interval', seconds=trigger.seconds, minutes=trigger.minutes, hours=trigger.hours, args=args, kwargs=kwargs, **options)
+            self.log("Job for '{}' added with trigger: {} seconds, {} minutes, {} hours.", fname, trigger.seconds, trigger.minutes, trigger.hours)
             
         return job.id
 
@@ -175,6 +205,7 @@ class ThreadManager:
     
     data = {}
     defaultProcessor: AsyncProcessor | None = None
+    _idIndex: dict[str, str] = {}
     
     @staticmethod
     def list() -> list[str]:
@@ -196,6 +227,7 @@ class ThreadManager:
             return "ERROR: A thread with that name already exists. Name must be unique."
         
         processor = AsyncProcessor(paused=paused, logging=logging)
+        ThreadManager._idIndex[processor.id] = name
         ThreadManager.data[name] = {
             "processor": processor,
             "name": name,
@@ -223,10 +255,11 @@ class ThreadManager:
     @staticmethod
     def getProcessorWithID(id: str) -> AsyncProcessor | None:
         '''Returns the `AsyncProcessor` instance for the thread with the given ID, or `None` if it does not exist.'''
-        for threadName in ThreadManager.list():
-            if ThreadManager.data[threadName]["processor"].id == id:
-                return ThreadManager.data[threadName]["processor"]
-        return None
+        name = ThreadManager._idIndex.get(id)
+        if name is None:
+            return None
+        
+        return ThreadManager.data[name]["processor"]
     
     @staticmethod
     def closeThread(name: str) -> bool:
@@ -237,6 +270,7 @@ class ThreadManager:
 
         processor.shutdown()
         del ThreadManager.data[name]
+        ThreadManager._idIndex.pop(processor.id, None)
         
         if name == "default":
             ThreadManager.defaultProcessor = None
@@ -2,10 +2,11 @@
 ## Version: 1.1
 ## Copyright: © 2025 Prakhar Trivedi. All rights reserved.
 
-import os, requests, copy, json, datetime
+import os, requests, copy, datetime
 from websockets.sync.client import ClientConnection, connect
 from websockets import Data
 from dotenv import load_dotenv
+from . import fastjson
 load_dotenv()
 
 class CloudFragment:
@@ -19,12 +20,13 @@ class CloudFragment:
     Fragments have to be requested, and approved by the maintainer of the target DataServer.
     
     ## Features
-    - `__init__(apiKey: str=os.environ.get("APIKey", None), fragmentID: str=None, secret: str=None, reason: str=None, url: str="https://data.prakhar.app")`: Initialises the CloudFragment object.
+    - `__init__(apiKey: str=os.environ.get("APIKey", None), fragmentID: str=None, secret: str=None, reason: str=None, url: str="https://data.prakhar.app", timeout: float=30.0)`: Initialises the CloudFragment object. `timeout` is the number of seconds an HTTP call may wait on the DataServer before failing.
     - `request()`: Requests a new fragment from the DataServer. Returns the fragment ID if successful.
     - `read(updateData: bool=True, returnOutputCopy: bool=True)`: Reads the data from the fragment. Returns the data as a dictionary if successful.
     - `write(data: dict=None, updateData: bool=True)`: Writes data to the fragment. Returns a success message if successful.
     - `delete(resetParams: bool=True)`: Deletes the fragment. Returns a success message if successful.
     - `data`: The data stored in the fragment. The `read()` and `write()` functions will update this attribute if `updateData=True`.
+    - `session`: The `requests.Session` used for all HTTP calls, which pools and keeps connections to the DataServer alive.
     
     ## Usage
     ```python
@@ -79,9 +81,10 @@ class CloudFragment:
     - The error message will be returned if the request fails, or if the parameters are not set correctly.
     
     ## Dependencies
-    - `os`, `requests`, `copy`, `dotenv`
+    - `os`, `requests`, `copy`, `dotenv`, `fastjson`
     - `dotenv` is used to load environment variables from a `.env` file.
-    - `requests` is used to make HTTP requests to the DataServer.
+    - `requests` is used to make HTTP requests to the DataServer, through a single `requests.Session` so connections are reused.
+    - `fastjson` (backed by `orjson`, falling back to `json`) is used to (de)serialize fragment payloads, which can be large.
     - `copy` is used to create a deep copy of the data attribute.
     
     ## About this service
@@ -108,8 +111,10 @@ class CloudFragment:
         Methods:
             __str__(): Returns a string representation of the StreamMessage object.
         """
+        __slots__ = ('type', 'data', 'message', 'buffer')
+        
         def __init__(self, buffer: str):
-            data = json.loads(buffer)
+            data = fastjson.loads(buffer)
             msgType = None
             msg = None
             
@@ -262,7 +267,7 @@ class CloudFragment:
         def disconnect(self):
             if self.conn != None:
                 if self.conn.close_code == None:
-                    self.send(json.dumps({"action": "close"}))
+                    self.send(fastjson.dumps({"action": "close"}).decode())
                     self.conn.close(reason="Client disconnected.")
                 self.conn = None
                 self.addHistory("DC: {}".format(self.fragmentID))
@@ -288,7 +293,7 @@ class CloudFragment:
                 "fragmentID": self.fragmentID,
                 "secret": self.secret
             }
-            sendResult = self.send(json.dumps(authPayload))
+            sendResult = self.send(fastjson.dumps(authPayload).decode())
             if sendResult != True:
                 self.disconnect()
                 return "ERROR: Failed to submit auth payload. Error: {}".format(sendResult)
@@ -315,7 +320,7 @@ class CloudFragment:
             if not self.status():
                 return "ERROR: Stream status unhealthy."
             
-            res = self.send(json.dumps({"action": "ping"}))
+            res = self.send(fastjson.dumps({"action": "ping"}).decode())
             if res != True:
                 return "ERROR: Failed to submit ping action. Error: {}".format(res)
             
@@ -333,15 +338,15 @@ class CloudFragment:
             if not self.status():
                 return "ERROR: Stream status unhealthy."
             
-            res = self.send(json.dumps({
+            res = self.send(fastjson.dumps({
                 "action": "write",
                 "data": data
-            }))
+            }).decode())
             if res != True:
                 return "ERROR: Failed to submit write action. Error: {}".format(res)
             
             if ignoreAck:
-                return CloudFragment.StreamMessage(json.dumps({"event": "write", "data": data}))
+                return CloudFragment.StreamMessage(fastjson.dumps({"event": "write", "data": data}).decode())
             
             ack = self.receive(3)
             if ack.startswith("ERROR"):
@@ -354,7 +359,7 @@ class CloudFragment:
             if not self.status():
                 return "ERROR: Stream status unhealthy."
             
-            res = self.send(json.dumps({"action": "read"}))
+            res = self.send(fastjson.dumps({"action": "read"}).decode())
             if res != True:
                 return "ERROR: Failed to submit read action. Error: {}".format(res)
             
@@ -365,15 +370,19 @@ class CloudFragment:
             
             return read
     
-    def __init__(self, apiKey: str=os.environ.get("APIKey", None), fragmentID: str=None, secret: str=None, reason: str=None, url: str="https://data.prakhar.app", wsURL: str="wss://data.prakhar.app"):
+    def __init__(self, apiKey: str=os.environ.get("APIKey", None), fragmentID: str=None, secret: str=None, reason: str=None, url: str="https://data.prakhar.app", wsURL: str="wss://data.prakhar.app", timeout: float=30.0):
         self.apiKey: str | None = apiKey
         self.fragmentID: str | None = fragmentID
         self.secret: str | None = secret
         self.reason: str | None = reason
         self.url: str = url
         self.wsURL: str = wsURL
+        self.timeout: float = timeout
         self.stream: CloudFragment.Stream | None = None
         self.data: dict | None = None
+        
+        # Reused across calls so the TCP/TLS connection to the DataServer is kept alive between requests
+        self.session: requests.Session = requests.Session()
     
     def serverPath(self, path: str):
         return self.url + path
@@ -409,10 +418,11 @@ class CloudFragment:
         
         requestResponse = None
         try:
-            requestResponse = requests.post(
+            requestResponse = self.session.post(
                 url=self.serverPath("/api/requestFragment"),
                 headers=self.apiHeaders(),
-                json=data
+                json=data,
+                timeout=self.timeout
             )
             
             requestResponse.raise_for_status()
@@ -438,23 +448,24 @@ class CloudFragment:
         
         readResponse = None
         try:
-            readResponse = requests.post(
+            readResponse = self.session.post(
                 url=self.serverPath("/api/readFragment"),
                 headers=self.apiHeaders(),
-                json=data
+                json=data,
+                timeout=self.timeout
             )
             
             readResponse.raise_for_status()
             
             if updateData:
-                self.data = readResponse.json()
+                self.data = fastjson.loads(readResponse.content)
                 
                 if returnOutputCopy:
                     return copy.deepcopy(self.data)
                 else:
                     return self.data
             else:
-                return readResponse.json()
+                return fastjson.loads(readResponse.content)
         except Exception as e:
             readableMessage: str = "<No readable message>"
             try:
@@ -472,14 +483,15 @@ class CloudFragment:
         
         writeResponse = None
         try:
-            writeResponse = requests.post(
+            writeResponse = self.session.post(
                 url=self.serverPath("/api/writeFragment"),
-                headers=self.apiHeaders(),
-                json={
+                headers={**self.apiHeaders(), "Content-Type": "application/json"},
+                data=fastjson.dumps({
                     "fragmentID": self.fragmentID,
                     "secret": self.secret,
                     "data": payload
-                }
+                }),
+                timeout=self.timeout
             )
             
             writeResponse.raise_for_status()
@@ -508,10 +520,11 @@ class CloudFragment:
         
         deleteResponse = None
         try:
-            deleteResponse = requests.post(
+            deleteResponse = self.session.post(
                 url=self.serverPath("/api/deleteFragment"),
                 headers=self.apiHeaders(),
-                json=data
+                json=data,
+                timeout=self.timeout
             )
             
             deleteResponse.raise_for_status()
@@ -600,7 +613,7 @@ class CloudFragment:
                 break
             update = CloudFragment.StreamMessage(update)
             if update.type == "ping":
-                self.stream.send(json.dumps({"action": "pong"}))
+                self.stream.send(fastjson.dumps({"action": "pong"}).decode())
             elif update.type == "write" and update.data != None:
                 self.data = update.data
                 if handler != None:
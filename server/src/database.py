@@ -1,8 +1,10 @@
-import os, json, datetime, time, threading, copy
+import os, datetime, time, threading
+from typing import Iterator
 from typing_extensions import Literal
+from . import fastjson
 from .client import CloudFragment
 from .background import ThreadManager, Trigger
-from .models import Note, Journal, User
+from .models import Note, Journal, User, notes_by_id
 
 # Schema:
 # - journals: dict
@@ -13,18 +15,50 @@ from .models import Note, Journal, User
 #         - created: str
 #         - keyphrase: str
 #         - notes: dict
-#             - id: str
-#             - title: str
-#             - content: str
-#             - created: str
-#             - modified: str | None = None
-#             - tags: list[str] = []
+#             - <note_id>: dict
+#                 - id: str
+#                 - title: str
+#                 - content: str
+#                 - created: str
+#                 - modified: str | None = None
+#                 - tags: list[str] = []
 
 class ScribeDB:
     credentialsFile = "credentials.json"
+    _lastCreds: dict | None = None
     fragment: CloudFragment | None = None
     _operational = False
+    
+    # Environment-driven settings, read once at import (`.client` loads `.env` first); assign these attributes to override at runtime
+    _httpMode = os.getenv("DB_MODE", "HTTP").upper() == "HTTP"
+    _refreshInterval = int(os.getenv("DB_REFRESH_INTERVAL", "30"))
+    _flushWindow = int(os.getenv("DB_FLUSH_INTERVAL_MS", "200")) / 1000
+    _readTTL = float(os.getenv("DB_READ_TTL", "5"))
+    _debugMode = os.getenv("DEBUG_MODE", "False").lower() == "true"
     _streamLock = threading.Lock()
+    _refreshLock = threading.Lock()
+    _refreshError: Exception | None = None
+    
+    # Mutations edit `fragment.data` in place under `_dataLock` and set `_dirty`; `flush()` uploads them
+    _dataLock = threading.RLock()
+    # Held across every upload, and by `refresh_local` across its flush, read and swap, so a read never races an upload
+    _flushLock = threading.RLock()
+    _pushCount = 0
+    _dirty = threading.Event()
+    _stopFlusher = threading.Event()
+    _lastRefresh: float | None = None
+    
+    # Deserialized journal cache, reset whenever `_cacheVersion` moves past `_cacheBuiltAt`.
+    # Entries are filled lazily per journal; `_cacheComplete` marks that every journal has been built.
+    _cacheVersion = 0
+    _cacheBuiltAt = -1
+    _cache: dict[str, Journal] = {}
+    _cacheComplete = False
+    
+    # User indices by ID and by username, rebuilt in a single pass when the cache version moves
+    _usersByID: dict[str, User] = {}
+    _usersByUsername: dict[str, User] = {}
+    _userIndexBuiltAt = -1
     
     @staticmethod
     def isOperational() -> bool:
@@ -32,21 +66,36 @@ class ScribeDB:
     
     @staticmethod
     def connectionModeIsHTTP() -> bool:
-        return os.getenv("DB_MODE", "HTTP").upper() == "HTTP"
+        return ScribeDB._httpMode
     
     @staticmethod
     def saveFragCreds(fragment: CloudFragment) -> None:
-        with open(ScribeDB.credentialsFile, "w") as f:
-            json.dump({
-                "fragID": fragment.fragmentID,
-                "secret": fragment.secret,
-                "apiKey": fragment.apiKey
-            }, f)
+        creds = {
+            "fragID": fragment.fragmentID,
+            "secret": fragment.secret,
+            "apiKey": fragment.apiKey
+        }
+        if creds == ScribeDB._lastCreds:
+            return
+        
+        # Write to a temporary file and swap it in, so an interrupted write never leaves corrupt credentials behind
+        tmpFile = ScribeDB.credentialsFile + ".tmp"
+        with open(tmpFile, "wb") as f:
+            f.write(fastjson.dumps(creds))
+        os.replace(tmpFile, ScribeDB.credentialsFile)
+        
+        ScribeDB._lastCreds = creds
     
     @staticmethod
     def initFragFromCreds() -> CloudFragment:
-        with open(ScribeDB.credentialsFile, "r") as f:
-            creds = json.load(f)
+        with open(ScribeDB.credentialsFile, "rb") as f:
+            creds = fastjson.loads(f.read())
+        
+        ScribeDB._lastCreds = {
+            "fragID": creds["fragID"],
+            "secret": creds["secret"],
+            "apiKey": creds["apiKey"]
+        }
         
         return CloudFragment(
             apiKey=creds["apiKey"],
@@ -54,6 +103,57 @@ class ScribeDB:
             secret=creds["secret"]
         )
     
+    @staticmethod
+    def invalidateCache() -> None:
+        ScribeDB._cacheVersion += 1
+    
+    @staticmethod
+    def cacheVersion() -> int:
+        return ScribeDB._cacheVersion
+    
+    @staticmethod
+    def markDirty() -> None:
+        ScribeDB.invalidateCache()
+        ScribeDB._dirty.set()
+    
+    @staticmethod
+    def flush() -> bool:
+        if not ScribeDB._dirty.is_set():
+            return False
+        
+        # Flushes are serialised so an older snapshot can never be sent after a newer one
+        with ScribeDB._flushLock:
+            with ScribeDB._dataLock:
+                if not ScribeDB._dirty.is_set():
+                    return False
+                
+                # Only the encoding is done under the lock; requests keep mutating while it is uploaded.
+                # The encoded bytes are embedded as-is in the write payload, so the data is serialized once per flush.
+                ScribeDB._dirty.clear()
+                snapshot = fastjson.fragment(fastjson.dumps(ScribeDB.fragment.data))
+            
+            try:
+                ScribeDB.push(snapshot)
+            except Exception:
+                ScribeDB._dirty.set()
+                raise
+        
+        return True
+    
+    @staticmethod
+    def live_flusher():
+        # Sleeps until a mutation marks the DB dirty, then waits out the flush window so a burst of edits becomes one write
+        while not ScribeDB._stopFlusher.is_set():
+            if not ScribeDB._dirty.wait(timeout=1):
+                continue
+            
+            ScribeDB._stopFlusher.wait(ScribeDB._flushWindow)
+            try:
+                ScribeDB.flush()
+            except Exception as e:
+                print("SCRIBEDB LIVE_FLUSHER ERROR: {}".format(e))
+                ScribeDB._stopFlusher.wait(1)
+    
     @staticmethod
     def live_reader():
         try:
@@ -64,8 +164,8 @@ class ScribeDB:
     @staticmethod
     def setup():
         if not os.path.isfile(ScribeDB.credentialsFile):
-            with open(ScribeDB.credentialsFile, 'w') as f:
-                json.dump({}, f)
+            with open(ScribeDB.credentialsFile, 'wb') as f:
+                f.write(fastjson.dumps({}))
             
             ScribeDB.fragment = CloudFragment(reason="Database storage for Scribe server. Request made: {}".format(datetime.datetime.now(datetime.timezone.utc).isoformat()))
             
@@ -81,7 +181,7 @@ class ScribeDB:
             
             input("SCRIBEDB SETUP: Fragment request successful. Please approve and hit Enter to continue...")
             
-            res = ScribeDB.fragment.read()
+            res = ScribeDB.fragment.read(returnOutputCopy=False)
             if isinstance(res, str) and res.startswith("ERROR"):
                 raise Exception("SCRIBEDB SETUP FATALERROR: Fragment read failed with error: {}".format(res))
             
@@ -89,13 +189,17 @@ class ScribeDB:
         else:
             ScribeDB.fragment = ScribeDB.initFragFromCreds()
             
-            res = ScribeDB.fragment.read()
+            res = ScribeDB.fragment.read(returnOutputCopy=False)
             if isinstance(res, str) and res.startswith("ERROR"):
                 raise Exception("SCRIBEDB SETUP FATALERROR: Fragment read failed with error: {}".format(res))
         
         ScribeDB._operational = True
         print("SCRIBEDB SETUP: DB read successful.")
         
+        migrated = ScribeDB.migrate_notes_layout()
+        if migrated:
+            print("SCRIBEDB SETUP: Migrated notes of {} journal(s) to the dict layout.".format(migrated))
+        
         if not ScribeDB.connectionModeIsHTTP():
             res = ScribeDB.fragment.initStream()
             if isinstance(res, str):
@@ -105,256 +209,431 @@ class ScribeDB:
         
         ThreadManager.defaultProcessor.addJob(
             ScribeDB.live_reader,
-            trigger=Trigger('interval', seconds=int(os.getenv("DB_REFRESH_INTERVAL", "30")))
+            trigger=Trigger('interval', seconds=ScribeDB._refreshInterval, coalesce=True, maxInstances=1)
         )
+        ScribeDB._stopFlusher.clear()
+        # The flusher runs once and loops until shutdown, so it must not be dropped for starting late
+        ThreadManager.defaultProcessor.addJob(ScribeDB.live_flusher, trigger=Trigger(misfireGraceTime=None))
         
         return True
     
+    @staticmethod
+    def migrate_notes_layout() -> int:
+        '''Converts journals that still store `notes` as a list into the `<note_id>: dict` layout. Returns the number of journals converted.'''
+        migrated = 0
+        with ScribeDB._dataLock:
+            for journalDict in ScribeDB.raw_journals().values():
+                if isinstance(journalDict, dict) and isinstance(journalDict.get("notes"), list):
+                    journalDict["notes"] = notes_by_id(journalDict["notes"])
+                    migrated += 1
+            
+            if migrated:
+                ScribeDB.markDirty()
+        
+        return migrated
+    
     @staticmethod
     def refresh_local() -> Literal[True]:
         if not ScribeDB.isOperational():
             raise Exception("SCRIBEDB REFRESH_LOCAL ERROR: Database not operational.")
         
-        if ScribeDB.connectionModeIsHTTP():
-            res = ScribeDB.fragment.read()
-            if isinstance(res, str) and res.startswith("ERROR"):
-                raise Exception("SCRIBEDB REFRESH_LOCAL ERROR: Fragment read failed with error: {}".format(res))
-        else:
-            with ScribeDB._streamLock:
-                res = ScribeDB.fragment.readWS()
-                if isinstance(res, str) and res.startswith("ERROR"):
-                    raise Exception("SCRIBEDB REFRESH_LOCAL ERROR: Fragment readWS failed with error: {}".format(res))
-                time.sleep(0.5)
+        # Concurrent callers share the refresh already in flight instead of queueing their own reads, including its failure
+        if not ScribeDB._refreshLock.acquire(blocking=False):
+            with ScribeDB._refreshLock:
+                if ScribeDB._refreshError is not None:
+                    raise ScribeDB._refreshError
+                return True
+        
+        ScribeDB._refreshError = None
+        try:
+            with ScribeDB._flushLock:
+                # Pending mutations would otherwise be overwritten by the fresh read
+                ScribeDB.flush()
+                with ScribeDB._dataLock:
+                    version = ScribeDB._cacheVersion
+                    pushCount = ScribeDB._pushCount
+                
+                # The network read happens outside `_dataLock`; only the swap below holds it
+                if ScribeDB.connectionModeIsHTTP():
+                    res = ScribeDB.fragment.read(updateData=False)
+                    if isinstance(res, str) and res.startswith("ERROR"):
+                        raise Exception("SCRIBEDB REFRESH_LOCAL ERROR: Fragment read failed with error: {}".format(res))
+                else:
+                    with ScribeDB._streamLock:
+                        res = ScribeDB.fragment.readWS(updateData=False)
+                        if isinstance(res, str) and res.startswith("ERROR"):
+                            raise Exception("SCRIBEDB REFRESH_LOCAL ERROR: Fragment readWS failed with error: {}".format(res))
+                
+                with ScribeDB._dataLock:
+                    # Local changes or uploads that landed during the read are kept; the next flush and refresh reconcile them.
+                    # `_dirty` also covers a save that landed after the flush snapshot but before `version` was taken.
+                    if not ScribeDB._dirty.is_set() and ScribeDB._cacheVersion == version and ScribeDB._pushCount == pushCount:
+                        ScribeDB.fragment.data = res
+                        ScribeDB.invalidateCache()
+                    
+                    ScribeDB._lastRefresh = time.monotonic()
+        except Exception as e:
+            ScribeDB._refreshError = e
+            raise
+        finally:
+            ScribeDB._refreshLock.release()
         
         return True
     
     @staticmethod
-    def write(data: dict | None = None):
+    def push(data):
+        '''Uploads `data` (a dict, or a pre-encoded `fastjson.fragment`) as the full fragment state. Call under `_flushLock`.'''
         if not ScribeDB.isOperational():
             raise Exception("SCRIBEDB WRITE ERROR: Database not operational.")
         
-        if data is None:
-            data = ScribeDB.fragment.data
-        
+        ScribeDB._pushCount += 1
+        # Writes always send the full latest state, so the server's echo is not applied back onto the local copy
         if ScribeDB.connectionModeIsHTTP():
-            res = ScribeDB.fragment.write(data)
+            res = ScribeDB.fragment.write(data, updateData=False)
             if isinstance(res, str) and res.startswith("ERROR"):
                 raise Exception("SCRIBEDB WRITE ERROR: Fragment write failed with error: {}".format(res))
         else:
             with ScribeDB._streamLock:
-                res = ScribeDB.fragment.writeWS(data)
+                res = ScribeDB.fragment.writeWS(data, updateData=False)
                 if isinstance(res, str) and res.startswith("ERROR"):
                     raise Exception("SCRIBEDB WRITE ERROR: Fragment writeWS failed with error: {}".format(res))
-                time.sleep(0.5)
+    
+    @staticmethod
+    def write(data: dict | None = None):
+        if data is None:
+            data = ScribeDB.fragment.data
+        
+        with ScribeDB._flushLock:
+            ScribeDB.push(data)
+            
+            if data is not ScribeDB.fragment.data:
+                with ScribeDB._dataLock:
+                    ScribeDB.fragment.data = data
+                    ScribeDB.invalidateCache()
         
         return True
     
     @staticmethod
     def read() -> dict:
+        # Skip the network round-trip if the local copy was refreshed within DB_READ_TTL seconds
+        if ScribeDB._lastRefresh is not None and time.monotonic() - ScribeDB._lastRefresh < ScribeDB._readTTL:
+            return ScribeDB.fragment.data
+        
         ScribeDB.refresh_local()
         return ScribeDB.fragment.data
     
     @staticmethod
-    def deserialized_journals() -> list[Journal]:
-        data = copy.deepcopy(ScribeDB.fragment.data)
-        journals = []
-        
-        if "journals" not in data or not isinstance(data["journals"], dict):
-            return journals
+    def journal_cache() -> dict[str, Journal]:
+        version = ScribeDB._cacheVersion
+        if ScribeDB._cacheBuiltAt != version:
+            ScribeDB._cache = {}
+            ScribeDB._cacheComplete = False
+            ScribeDB._cacheBuiltAt = version
+        
+        return ScribeDB._cache
+    
+    @staticmethod
+    def raw_journals() -> dict:
+        journalsData = ScribeDB.fragment.data.get("journals")
+        if not isinstance(journalsData, dict):
+            return {}
         
-        for _, journalDict in data["journals"].items():
-            journals.append(Journal.from_dict(journalDict))
+        return journalsData
+    
+    @staticmethod
+    def cached_journals() -> dict[str, Journal]:
+        cache = ScribeDB.journal_cache()
+        if ScribeDB._cacheComplete:
+            return cache
+        
+        # Journal.from_dict builds fresh objects, so the live data does not need to be copied first
+        with ScribeDB._dataLock:
+            for journal_id, journalDict in ScribeDB.raw_journals().items():
+                if journal_id not in cache:
+                    cache[journal_id] = Journal.from_dict(journalDict)
+            
+            if ScribeDB._cache is cache:
+                ScribeDB._cacheComplete = True
         
-        return journals
+        return cache
+    
+    @staticmethod
+    def deserialized_journals() -> list[Journal]:
+        return list(ScribeDB.cached_journals().values())
+    
+    @staticmethod
+    def iter_journals_by_author(author_id: str) -> Iterator[Journal]:
+        # Filter on the raw authorID first so only this author's journals are ever deserialized
+        with ScribeDB._dataLock:
+            journalIDs = [journal_id for journal_id, journalDict in ScribeDB.raw_journals().items() if isinstance(journalDict, dict) and journalDict.get("authorID", "") == author_id]
+        
+        for journal_id in journalIDs:
+            journal = ScribeDB.retrieve_journal(journal_id)
+            if journal is not None:
+                yield journal
     
     @staticmethod
     def deserialized_users() -> list[User]:
-        data = copy.deepcopy(ScribeDB.fragment.data)
-        
-        users = []
-        if "users" not in data or not isinstance(data["users"], dict):
-            return users
-        
-        for _, userDict in data["users"].items():
-            users.append(User.from_dict(userDict))
+        # User.from_dict builds fresh objects, so iterate the live data directly instead of a deep copy
+        with ScribeDB._dataLock:
+            usersData = ScribeDB.fragment.data.get("users")
+            if not isinstance(usersData, dict):
+                return []
+            
+            return [User.from_dict(userDict) for userDict in usersData.values()]
+    
+    @staticmethod
+    def user_indices() -> tuple[dict[str, User], dict[str, User]]:
+        version = ScribeDB._cacheVersion
+        if ScribeDB._userIndexBuiltAt != version:
+            usersByID = {}
+            usersByUsername = {}
+            for user in ScribeDB.deserialized_users():
+                usersByID[user.id] = user
+                usersByUsername[user.username] = user
+            
+            ScribeDB._usersByID = usersByID
+            ScribeDB._usersByUsername = usersByUsername
+            ScribeDB._userIndexBuiltAt = version
         
-        return users
+        return ScribeDB._usersByID, ScribeDB._usersByUsername
     
     @staticmethod
     def retrieve_user(user_id: str) -> User | None:
-        users = ScribeDB.deserialized_users()
-        for user in users:
-            if user.id == user_id:
-                return user
-        
-        return None
+        return ScribeDB.user_indices()[0].get(user_id)
     
     @staticmethod
     def retrieve_user_by_username(username: str) -> User | None:
-        users = ScribeDB.deserialized_users()
-        for user in users:
-            if user.username == username:
-                return user
-        
-        return None
+        return ScribeDB.user_indices()[1].get(username)
     
     @staticmethod
     def save_user(user: User) -> bool:
-        data = copy.deepcopy(ScribeDB.fragment.data)
-        
-        if "users" not in data:
-            data["users"] = {}
-        
-        if not isinstance(data["users"], dict):
-            data["users"] = {}
-        
-        data["users"][user.id] = user.to_dict()
+        '''Saves `user`, or returns `False` without saving if another user already has its username.'''
+        with ScribeDB._dataLock:
+            # The username check and the write share the lock, so concurrent creates or renames cannot both claim a name
+            existing = ScribeDB.retrieve_user_by_username(user.username)
+            if existing is not None and existing.id != user.id:
+                return False
+            
+            data = ScribeDB.fragment.data
+            
+            if "users" not in data or not isinstance(data["users"], dict):
+                data["users"] = {}
+            
+            data["users"][user.id] = user.to_dict()
+            ScribeDB.markDirty()
         
-        ScribeDB.write(data)
         return True
     
     @staticmethod
     def delete_user(user_id: str) -> bool:
-        data = copy.deepcopy(ScribeDB.fragment.data)
-        
-        if "users" not in data or not isinstance(data["users"], dict):
-            return False
-        
-        if user_id not in data["users"]:
-            return False
-        
-        del data["users"][user_id]
-        
-        if "journals" in data and isinstance(data["journals"], dict):
-            journals_to_delete = []
-            for journal_id, journalDict in data["journals"].items():
-                if journalDict.get("authorID", "") == user_id:
-                    journals_to_delete.append(journal_id)
+        with ScribeDB._dataLock:
+            data = ScribeDB.fragment.data
             
-            for journal_id in journals_to_delete:
-                del data["journals"][journal_id]
+            if "users" not in data or not isinstance(data["users"], dict):
+                return False
+            
+            if user_id not in data["users"]:
+                return False
+            
+            del data["users"][user_id]
+            
+            if "journals" in data and isinstance(data["journals"], dict):
+                journals_to_delete = []
+                for journal_id, journalDict in data["journals"].items():
+                    if journalDict.get("authorID", "") == user_id:
+                        journals_to_delete.append(journal_id)
+                
+                for journal_id in journals_to_delete:
+                    del data["journals"][journal_id]
+            
+            ScribeDB.markDirty()
         
-        ScribeDB.write(data)
         return True
     
     @staticmethod
     def retrieve_journal(journal_id: str) -> Journal | None:
-        journals = ScribeDB.deserialized_journals()
-        for journal in journals:
-            if journal.id == journal_id:
-                return journal
+        cache = ScribeDB.journal_cache()
+        journal = cache.get(journal_id)
+        if journal is not None:
+            return journal
+        
+        # Only the requested journal is deserialized
+        with ScribeDB._dataLock:
+            journalDict = ScribeDB.raw_journals().get(journal_id)
+            if not isinstance(journalDict, dict):
+                return None
+            
+            journal = Journal.from_dict(journalDict)
         
-        return None
+        cache[journal_id] = journal
+        return journal
     
     @staticmethod
     def retrieve_journal_with_author(journal_id: str, authorID: str) -> Journal | None:
-        journal = ScribeDB.retrieve_journal(journal_id)
-        if journal is None:
+        # Check ownership on the raw data before deserializing anything
+        journalDict = ScribeDB.raw_journals().get(journal_id)
+        if not isinstance(journalDict, dict) or journalDict.get("authorID", "") != authorID:
             return None
         
-        if journal.authorID != authorID:
-            return None
+        return ScribeDB.retrieve_journal(journal_id)
+    
+    @staticmethod
+    def note_from_raw(journal_id: str, journalDict: dict, note_id: str) -> Note | None:
+        cached = ScribeDB.journal_cache().get(journal_id)
+        if cached is not None:
+            return cached.notes.get(note_id)
+        
+        notesData = journalDict.get("notes")
+        if isinstance(notesData, dict):
+            # Only the requested note is deserialized
+            with ScribeDB._dataLock:
+                noteDict = notesData.get(note_id)
+                return Note.from_dict(noteDict) if isinstance(noteDict, dict) else None
         
-        return journal
+        journal = ScribeDB.retrieve_journal(journal_id)
+        return journal.notes.get(note_id) if journal is not None else None
     
     @staticmethod
     def retrieve_note(journal_id: str, note_id: str) -> Note | None:
-        journal = ScribeDB.retrieve_journal(journal_id)
-        if journal is None:
+        journalDict = ScribeDB.raw_journals().get(journal_id)
+        if not isinstance(journalDict, dict):
             return None
         
-        for note in journal.notes:
-            if note.id == note_id:
-                return note
-        
-        return None
+        return ScribeDB.note_from_raw(journal_id, journalDict, note_id)
     
     @staticmethod
     def retrieve_note_with_author(journal_id: str, note_id: str, authorID: str) -> Note | None:
-        journal = ScribeDB.retrieve_journal_with_author(journal_id, authorID)
-        if journal is None:
+        journalDict = ScribeDB.raw_journals().get(journal_id)
+        if not isinstance(journalDict, dict) or journalDict.get("authorID", "") != authorID:
             return None
         
-        for note in journal.notes:
-            if note.id == note_id:
-                return note
-        
-        return None
+        return ScribeDB.note_from_raw(journal_id, journalDict, note_id)
     
     @staticmethod
     def save_journal(journal: Journal) -> bool:
-        if journal.authorID not in [user.id for user in ScribeDB.deserialized_users()]:
+        if ScribeDB.retrieve_user(journal.authorID) is None:
             raise Exception("SCRIBEDB SAVE_JOURNAL ERROR: AuthorID does not correspond to any existing user.")
         
-        data = copy.deepcopy(ScribeDB.fragment.data)
-        
-        if "journals" not in data:
-            data["journals"] = {}
-        
-        if not isinstance(data["journals"], dict):
-            data["journals"] = {}
-        
-        data["journals"][journal.id] = journal.to_dict()
+        with ScribeDB._dataLock:
+            data = ScribeDB.fragment.data
+            
+            if "journals" not in data or not isinstance(data["journals"], dict):
+                data["journals"] = {}
+            
+            # Only the journal's own fields are written over an existing record; its notes are changed solely through
+            # mutate_notes/delete_note, so a journal loaded before a concurrent note save cannot wipe that note out
+            stored = data["journals"].get(journal.id)
+            if isinstance(stored, dict):
+                stored.update(journal.to_dict(includeNotes=False))
+            else:
+                data["journals"][journal.id] = journal.to_dict()
+            ScribeDB.markDirty()
         
-        ScribeDB.write(data)
         return True
     
     @staticmethod
     def delete_journal(journal_id: str, authorID: str | None=None) -> bool:
-        data = copy.deepcopy(ScribeDB.fragment.data)
+        with ScribeDB._dataLock:
+            data = ScribeDB.fragment.data
+            
+            if "journals" not in data or not isinstance(data["journals"], dict):
+                return False
+            
+            if journal_id not in data["journals"]:
+                return False
+            if authorID:
+                if data["journals"][journal_id].get("authorID", "") != authorID:
+                    return False
+            
+            del data["journals"][journal_id]
+            ScribeDB.markDirty()
         
-        if "journals" not in data or not isinstance(data["journals"], dict):
-            return False
+        return True
+    
+    @staticmethod
+    def raw_notes(journalDict: dict) -> dict:
+        '''Returns the stored `<note_id>: dict` mapping of a raw journal, converting the legacy list layout in place. Call under `_dataLock`.'''
+        notesData = journalDict.get("notes")
+        if not isinstance(notesData, dict):
+            notesData = journalDict["notes"] = notes_by_id(notesData)
         
-        if journal_id not in data["journals"]:
-            return False
-        if authorID:
-            if data["journals"][journal_id].get("authorID", "") != authorID:
+        return notesData
+    
+    @staticmethod
+    def mutate_notes(journal_id: str, notes: dict[str, Note], authorID: str | None=None, replace: bool=False) -> bool:
+        '''Writes notes straight into the stored journal dict under the data lock, without deserializing or re-serializing the journal.
+        Existing notes with the same IDs are replaced; with `replace=True` the journal's notes are swapped for `notes` entirely.'''
+        with ScribeDB._dataLock:
+            journalDict = ScribeDB.raw_journals().get(journal_id)
+            if not isinstance(journalDict, dict):
                 return False
+            if authorID is not None and journalDict.get("authorID", "") != authorID:
+                return False
+            
+            if replace:
+                notesData = journalDict["notes"] = {}
+            else:
+                notesData = ScribeDB.raw_notes(journalDict)
+            
+            for note_id, note in notes.items():
+                notesData[note_id] = note.to_dict()
+            
+            ScribeDB.markDirty()
         
-        del data["journals"][journal_id]
-        
-        ScribeDB.write(data)
         return True
     
     @staticmethod
-    def save_note(note: Note, journal_id: str, authorID: str | None=None) -> bool:
-        journal = ScribeDB.retrieve_journal(journal_id) if authorID is None else ScribeDB.retrieve_journal_with_author(journal_id, authorID)
-        if journal is None:
-            return False
-        
-        # Check if note with same ID exists, update if so
-        for idx, existing_note in enumerate(journal.notes):
-            if existing_note.id == note.id:
-                journal.notes[idx] = note
-                ScribeDB.save_journal(journal)
-                return True
+    def delete_note(journal_id: str, note_id: str, authorID: str | None=None) -> bool:
+        with ScribeDB._dataLock:
+            journalDict = ScribeDB.raw_journals().get(journal_id)
+            if not isinstance(journalDict, dict):
+                return False
+            if authorID is not None and journalDict.get("authorID", "") != authorID:
+                return False
+            
+            notesData = ScribeDB.raw_notes(journalDict)
+            if note_id not in notesData:
+                return False
+            
+            del notesData[note_id]
+            ScribeDB.markDirty()
         
-        # Otherwise, add new note
-        journal.notes.append(note)
-        ScribeDB.save_journal(journal)
         return True
     
+    @staticmethod
+    def save_note(note: Note, journal_id: str, authorID: str | None=None) -> bool:
+        # Inserts the note, or replaces an existing note with the same ID
+        return ScribeDB.mutate_notes(journal_id, {note.id: note}, authorID)
+    
     @staticmethod
     def save_entries(journal_id: str, notes: list[Note], authorID: str | None=None) -> bool:
-        journal = ScribeDB.retrieve_journal(journal_id) if authorID is None else ScribeDB.retrieve_journal_with_author(journal_id, authorID)
-        if journal is None:
-            return False
-        
-        journal.notes = notes
-        return ScribeDB.save_journal(journal)
+        return ScribeDB.mutate_notes(journal_id, {note.id: note for note in notes}, authorID, replace=True)
+    
+    @staticmethod
+    def save_notes_bulk(journal_id: str, notes: dict[str, Note], authorID: str | None=None) -> bool:
+        '''Inserts or replaces many notes (keyed by note ID) in a journal with a single save. Prefer this over calling `save_note` in a loop.'''
+        return ScribeDB.mutate_notes(journal_id, notes, authorID)
     
     @staticmethod
     def shutdown():
         if not ScribeDB.isOperational():
             return
         
+        ScribeDB._stopFlusher.set()
+        try:
+            ScribeDB.flush()
+        except Exception as e:
+            print("SCRIBEDB SHUTDOWN ERROR: Final flush failed with error: {}".format(e))
+        
         if not ScribeDB.connectionModeIsHTTP() and ScribeDB.fragment.stream is not None:
             ScribeDB.fragment.stream.disconnect()
             
-            if os.getenv("DEBUG_MODE", "False").lower() == "true":
-                with open("ScribeDBStreamLog.txt", "w") as f:
-                    content = "\n".join(ScribeDB.fragment.stream.history)
-                    f.write(content)
+            if ScribeDB._debugMode:
+                # Streamed entry by entry so the whole history is never joined into one string
+                with open("ScribeDBStreamLog.txt", "wb", buffering=1 << 20) as f:
+                    f.writelines(item.encode() + b"\n" for item in ScribeDB.fragment.stream.history)
             
-            print("SCRIBEDB SHUTDOWN: Fragment stream disconnected.")
\ No newline at end of file
+            print("SCRIBEDB SHUTDOWN: Fragment stream disconnected.")
+        
+        ScribeDB.fragment.session.close()
\ No newline at end of file
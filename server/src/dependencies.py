@@ -1,15 +1,43 @@
+import hmac, time, threading
 from typing import Annotated
 from fastapi import Header, HTTPException, Depends
 from .models import User
 from .database import ScribeDB
 
-async def authorised_user(username: Annotated[str, Header()], keyphrase: Annotated[str, Header()]) -> User:
+# (username, keyphrase) -> (expiry, cache version, user or None for failed lookups)
+AUTH_CACHE_TTL = 5
+AUTH_CACHE_SIZE = 1024
+_authCache: dict[tuple[str, str], tuple[float, int, User | None]] = {}
+_authCacheLock = threading.Lock()
+
+def lookup_user(username: str, keyphrase: str) -> User | None:
     user = ScribeDB.retrieve_user_by_username(username)
-    
     if not user:
-        raise HTTPException(status_code=401, detail="Unauthorized user.")
+        return None
+    
+    # Constant-time comparison; encoded because compare_digest only accepts ASCII str
+    if not hmac.compare_digest(user.keyphrase.encode(), keyphrase.encode()):
+        return None
+    
+    return user
+
+def authorised_user(username: Annotated[str, Header()], keyphrase: Annotated[str, Header()]) -> User:
+    key = (username, keyphrase)
+    now = time.monotonic()
+    version = ScribeDB.cacheVersion()
+    
+    # Entries expire after the TTL and on any DB change (e.g. save_user/delete_user bump the cache version)
+    entry = _authCache.get(key)
+    if entry is not None and entry[0] > now and entry[1] == version:
+        user = entry[2]
+    else:
+        user = lookup_user(username, keyphrase)
+        with _authCacheLock:
+            if key not in _authCache and len(_authCache) >= AUTH_CACHE_SIZE:
+                _authCache.pop(next(iter(_authCache)))
+            _authCache[key] = (now + AUTH_CACHE_TTL, version, user)
     
-    if user.keyphrase != keyphrase:
+    if user is None:
         raise HTTPException(status_code=401, detail="Unauthorized user.")
     
     return user
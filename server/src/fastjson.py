@@ -0,0 +1,26 @@
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    import json
+
+def dumps(obj) -> bytes:
+    '''Serializes `obj` to JSON bytes with `orjson` when available, falling back to the stdlib `json` module.'''
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+def loads(data: bytes | str):
+    '''Parses JSON from `bytes` or `str` with `orjson` when available, falling back to the stdlib `json` module.'''
+    if orjson is not None:
+        return orjson.loads(data)
+    
+    return json.loads(data)
+
+def fragment(data: bytes):
+    '''Wraps already-serialized JSON `bytes` so `dumps` embeds them verbatim (`orjson.Fragment`). Without `orjson` (or on versions before 3.9), the bytes are parsed back into an object instead.'''
+    if orjson is not None and hasattr(orjson, "Fragment"):
+        return orjson.Fragment(data)
+    
+    return loads(data)
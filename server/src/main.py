@@ -1,23 +1,26 @@
 import datetime
-from uuid import uuid4
+from secrets import token_hex
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from .background import ThreadManager
-from .models import Journal, JournalCreate, JournalUpdate, Note, NoteCreate, NoteUpdate, User, UserCreate, UserUpdate, UserInfo, ErrorMessage, StatusUpdate
+from .models import Journal, JournalCreate, JournalUpdate, JournalInfo, Note, NoteCreate, NoteUpdate, User, UserCreate, UserUpdate, UserInfo, ErrorMessage, StatusUpdate
 from .database import ScribeDB
 from .dependencies import obtain_user
 from contextlib import asynccontextmanager
 
+_UTC = datetime.timezone.utc
+_now = datetime.datetime.now
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     ThreadManager.initDefault()
     ScribeDB.setup()
     yield
-    ThreadManager.shutdown()
     ScribeDB.shutdown()
+    ThreadManager.shutdown()
 
-app = FastAPI(title='Scribe', lifespan=lifespan)
+app = FastAPI(title='Scribe', lifespan=lifespan, default_response_class=ORJSONResponse)
 
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"], allow_credentials=True)
 
@@ -32,20 +35,18 @@ async def home():
         "description": "Username already exists."
     }
 })
-async def create_user(info: UserCreate) -> UserInfo:
-    all_users = ScribeDB.deserialized_users()
-    if any(u.username == info.username for u in all_users):
-        raise HTTPException(status_code=409, detail="Username already exists.")
-    
+def create_user(info: UserCreate) -> UserInfo:
     user = User(
-        id=uuid4().hex,
+        id=token_hex(16),
         username=info.username,
         keyphrase=info.keyphrase,
-        created=datetime.datetime.now(datetime.timezone.utc).isoformat()
+        created=_now(_UTC).isoformat()
     )
     
-    ScribeDB.save_user(user)
-    return user.desensitised()
+    if not ScribeDB.save_user(user):
+        raise HTTPException(status_code=409, detail="Username already exists.")
+    
+    return ORJSONResponse(content=user.desensitised())
 
 @app.post("/new/journal", responses={
     401: {
@@ -53,17 +54,17 @@ async def create_user(info: UserCreate) -> UserInfo:
         "description": "Unauthorized user."
     }
 })
-async def create_journal(info: JournalCreate, user: obtain_user) -> Journal:
+def create_journal(info: JournalCreate, user: obtain_user) -> JournalInfo:
     journal = Journal(
-        id=uuid4().hex,
+        id=token_hex(16),
         authorID=user.id,
         title=info.title,
         description=info.description,
-        created=datetime.datetime.now(datetime.timezone.utc).isoformat()
+        created=_now(_UTC).isoformat()
     )
     
     ScribeDB.save_journal(journal)
-    return journal
+    return ORJSONResponse(content=journal.serialised())
 
 @app.post("/new/note", responses={
     404: {
@@ -74,12 +75,12 @@ async def create_journal(info: JournalCreate, user: obtain_user) -> Journal:
         "description": "Unauthorized user."
     }
 })
-async def create_note(note: NoteCreate, user: obtain_user) -> Note:
+def create_note(note: NoteCreate, user: obtain_user) -> Note:
     new_note = Note(
-        id=uuid4().hex,
+        id=token_hex(16),
         title=note.title,
         content=note.content,
-        created=datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        created=_now(_UTC).isoformat(),
         tags=note.tags
     )
     status = ScribeDB.save_note(
@@ -90,7 +91,7 @@ async def create_note(note: NoteCreate, user: obtain_user) -> Note:
     if not status:
         raise HTTPException(status_code=404, detail="Journal not found.")
     
-    return new_note
+    return ORJSONResponse(content=new_note)
 
 ## User Endpoints
 @app.get("/user", responses={
@@ -99,8 +100,8 @@ async def create_note(note: NoteCreate, user: obtain_user) -> Note:
         "description": "Unauthorized user."
     }
 })
-async def get_user(user: obtain_user) -> UserInfo:
-    return user.desensitised()
+def get_user(user: obtain_user) -> UserInfo:
+    return ORJSONResponse(content=user.desensitised())
 
 @app.put("/user", responses={
     401: {
@@ -112,16 +113,14 @@ async def get_user(user: obtain_user) -> UserInfo:
         "description": "Username already exists."
     }
 })
-async def update_user(user: obtain_user, info: UserUpdate) -> UserInfo:
-    if isinstance(info.username, str) and user.username != info.username:
-        all_users = ScribeDB.deserialized_users()
-        if any(u.username == info.username for u in all_users):
+def update_user(user: obtain_user, info: UserUpdate) -> UserInfo:
+    updated = user.update(info)
+    if updated is not None:
+        if not ScribeDB.save_user(updated):
             raise HTTPException(status_code=409, detail="Username already exists.")
+        user = updated
     
-    if user.update(info):
-        ScribeDB.save_user(user)
-    
-    return user.desensitised()
+    return ORJSONResponse(content=user.desensitised())
 
 @app.delete("/user", responses={
     401: {
@@ -133,9 +132,9 @@ async def update_user(user: obtain_user, info: UserUpdate) -> UserInfo:
         "description": "User deleted successfully."
     }
 })
-async def delete_user(user: obtain_user) -> dict:
+def delete_user(user: obtain_user) -> dict:
     ScribeDB.delete_user(user.id)
-    return JSONResponse(content={"status": "User deleted successfully."})
+    return ORJSONResponse(content={"status": "User deleted successfully."})
 
 ## Journal Endpoints
 @app.get("/journals", responses={
@@ -144,10 +143,10 @@ async def delete_user(user: obtain_user) -> dict:
         "description": "Unauthorized user."
     }
 })
-async def get_user_journals(user: obtain_user) -> list[Journal]:
-    journals = ScribeDB.deserialized_journals()
-    user_journals = [journal for journal in journals if journal.authorID == user.id]
-    return user_journals
+def get_user_journals(user: obtain_user) -> list[JournalInfo]:
+    # Stored models are dataclasses that orjson encodes natively, so routes returning them build the response directly
+    # instead of going through FastAPI's response validation and jsonable_encoder pass
+    return ORJSONResponse(content=[journal.serialised() for journal in ScribeDB.iter_journals_by_author(user.id)])
 
 @app.get("/journal/{journal_id}", responses={
     404: {
@@ -159,12 +158,12 @@ async def get_user_journals(user: obtain_user) -> list[Journal]:
         "description": "Unauthorized user."
     }
 })
-def get_journal(journal_id: str, user: obtain_user) -> Journal:
+def get_journal(journal_id: str, user: obtain_user) -> JournalInfo:
     journal = ScribeDB.retrieve_journal_with_author(journal_id, user.id)
     if journal is None:
         raise HTTPException(status_code=404, detail="Journal not found.")
     
-    return journal
+    return ORJSONResponse(content=journal.serialised())
 
 @app.put("/journal/{journal_id}", responses={
     404: {
@@ -176,15 +175,17 @@ def get_journal(journal_id: str, user: obtain_user) -> Journal:
         "description": "Unauthorized user."
     }
 })
-async def update_journal(journal_id: str, info: JournalUpdate, user: obtain_user) -> Journal:
+def update_journal(journal_id: str, info: JournalUpdate, user: obtain_user) -> JournalInfo:
     journal = ScribeDB.retrieve_journal_with_author(journal_id, user.id)
     if journal is None:
         raise HTTPException(status_code=404, detail="Journal not found.")
     
-    if journal.update(info):
-        ScribeDB.save_journal(journal)
+    updated = journal.update(info)
+    if updated is not None:
+        ScribeDB.save_journal(updated)
+        journal = updated
     
-    return journal
+    return ORJSONResponse(content=journal.serialised())
 
 @app.delete("/journal/{journal_id}", responses={
     404: {
@@ -200,12 +201,12 @@ async def update_journal(journal_id: str, info: JournalUpdate, user: obtain_user
         "description": "Journal deleted successfully."
     }
 })
-async def delete_journal(journal_id: str, user: obtain_user):
+def delete_journal(journal_id: str, user: obtain_user):
     status = ScribeDB.delete_journal(journal_id, user.id)
     if not status:
         raise HTTPException(status_code=404, detail="Journal not found.")
     
-    return JSONResponse(content={"status": "Journal deleted successfully."})
+    return ORJSONResponse(content={"status": "Journal deleted successfully."})
 
 @app.get("/journal/{journal_id}/notes", responses={
     404: {
@@ -217,12 +218,12 @@ async def delete_journal(journal_id: str, user: obtain_user):
         "description": "Unauthorized user."
     }
 })
-async def get_journal_notes(journal_id: str, user: obtain_user) -> list[Note]:
+def get_journal_notes(journal_id: str, user: obtain_user) -> list[Note]:
     journal = ScribeDB.retrieve_journal_with_author(journal_id, user.id)
     if journal is None:
         raise HTTPException(status_code=404, detail="Journal not found.")
     
-    return journal.notes
+    return ORJSONResponse(content=list(journal.notes.values()))
 
 ## Note Endpoints
 @app.get("/journal/{journal_id}/note/{note_id}", responses={
@@ -235,16 +236,12 @@ async def get_journal_notes(journal_id: str, user: obtain_user) -> list[Note]:
         "description": "Unauthorized user."
     }
 })
-async def get_journal_note(journal_id: str, note_id: str, user: obtain_user) -> Note:
-    journal = ScribeDB.retrieve_journal_with_author(journal_id, user.id)
-    if journal is None:
-        raise HTTPException(status_code=404, detail="Journal or Note not found.")
-    
-    target_note = next((note for note in journal.notes if note.id == note_id), None)
+def get_journal_note(journal_id: str, note_id: str, user: obtain_user) -> Note:
+    target_note = ScribeDB.retrieve_note_with_author(journal_id, note_id, user.id)
     if target_note is None:
         raise HTTPException(status_code=404, detail="Journal or Note not found.")
     
-    return target_note
+    return ORJSONResponse(content=target_note)
 
 @app.put("/journal/{journal_id}/note/{note_id}", responses={
     404: {
@@ -256,19 +253,18 @@ async def get_journal_note(journal_id: str, note_id: str, user: obtain_user) ->
         "description": "Unauthorized user."
     }
 })
-async def update_journal_note(journal_id: str, note_id: str, info: NoteUpdate, user: obtain_user) -> Note:
-    journal = ScribeDB.retrieve_journal_with_author(journal_id, user.id)
-    if journal is None:
-        raise HTTPException(status_code=404, detail="Journal or Note not found.")
-    
-    target_note = next((note for note in journal.notes if note.id == note_id), None)
+def update_journal_note(journal_id: str, note_id: str, info: NoteUpdate, user: obtain_user) -> Note:
+    target_note = ScribeDB.retrieve_note_with_author(journal_id, note_id, user.id)
     if target_note is None:
         raise HTTPException(status_code=404, detail="Journal or Note not found.")
     
-    if target_note.update(info):
-        ScribeDB.save_journal(journal)
+    updated = target_note.update(info)
+    if updated is not None:
+        if not ScribeDB.save_note(updated, journal_id, user.id):
+            raise HTTPException(status_code=404, detail="Journal or Note not found.")
+        target_note = updated
     
-    return target_note
+    return ORJSONResponse(content=target_note)
 
 @app.delete("/journal/{journal_id}/note/{note_id}", responses={
     404: {
@@ -284,20 +280,9 @@ async def update_journal_note(journal_id: str, note_id: str, info: NoteUpdate, u
         "description": "Note deleted successfully."
     }
 })
-async def delete_journal_note(journal_id: str, note_id: str, user: obtain_user):
-    journal = ScribeDB.retrieve_journal_with_author(journal_id, user.id)
-    if journal is None:
-        raise HTTPException(status_code=404, detail="Journal or Note not found.")
-    
-    target_note = next((note for note in journal.notes if note.id == note_id), None)
-    if target_note is None:
-        raise HTTPException(status_code=404, detail="Journal or Note not found.")
-    
-    try:
-        journal.notes.remove(target_note)
-    except ValueError:
+def delete_journal_note(journal_id: str, note_id: str, user: obtain_user):
+    status = ScribeDB.delete_note(journal_id, note_id, user.id)
+    if not status:
         raise HTTPException(status_code=404, detail="Journal or Note not found.")
     
-    ScribeDB.save_journal(journal)
-    
-    return JSONResponse(content={"status": "Note deleted successfully."})
\ No newline at end of file
+    return ORJSONResponse(content={"status": "Note deleted successfully."})
\ No newline at end of file
@@ -1,19 +1,51 @@
-import datetime
+import datetime, sys
+from dataclasses import dataclass, field, replace
 from pydantic import BaseModel
 
+# Bound once at import; timestamps are taken on every create/update
+_UTC = datetime.timezone.utc
+_now = datetime.datetime.now
+
+def apply_update(target, info: BaseModel, updatable: frozenset[str]):
+    '''Returns a copy of `target` with the fields the client actually sent in `info` applied (skipping `None` and unchanged values) and `modified` stamped, or `None` if nothing changed.
+    `target` itself is never modified, since instances handed out by ScribeDB's caches are shared between requests.'''
+    changes = {}
+    for name in info.model_fields_set & updatable:
+        value = getattr(info, name)
+        if value is not None and value != getattr(target, name):
+            changes[name] = value
+    if not changes:
+        return None
+    
+    return replace(target, modified=_now(_UTC).isoformat(), **changes)
+
+def notes_by_id(notesData) -> dict:
+    '''Returns stored journal notes as a `<note_id>: dict` mapping, converting the legacy layout that stored them as a list.'''
+    if isinstance(notesData, dict):
+        return notesData
+    if isinstance(notesData, list):
+        return {nd.get("id", ""): nd for nd in notesData if isinstance(nd, dict)}
+    
+    return {}
+
 class ErrorMessage(BaseModel):
     detail: str
 
 class StatusUpdate(BaseModel):
     status: str
 
-class User(BaseModel):
+# Stored records are plain slotted dataclasses; they are only ever built from our own data, so no validation is needed.
+# Pydantic models are kept for request bodies and response schemas.
+@dataclass(slots=True)
+class User:
     id: str
     username: str
     keyphrase: str
     created: str
     modified: str | None = None
     
+    _UPDATABLE = frozenset({"username", "keyphrase"})
+    
     @staticmethod
     def from_dict(data: dict) -> 'User':
         return User(
@@ -33,26 +65,17 @@ class User(BaseModel):
             "modified": self.modified
         }
     
-    def update(self, info: 'UserUpdate') -> bool:
-        changes = False
-        if info.username is not None and info.username != self.username:
-            self.username = info.username
-            changes = True
-        if info.keyphrase is not None and info.keyphrase != self.keyphrase:
-            self.keyphrase = info.keyphrase
-            changes = True
-        if changes:
-            self.modified = datetime.datetime.now(datetime.timezone.utc).isoformat()
-        
-        return changes
-    
-    def desensitised(self) -> 'UserInfo':
-        return UserInfo(
-            id=self.id,
-            username=self.username,
-            created=self.created,
-            modified=self.modified
-        )
+    def update(self, info: 'UserUpdate') -> 'User | None':
+        return apply_update(self, info, User._UPDATABLE)
+    
+    def desensitised(self) -> dict:
+        # Response shape of `UserInfo`, without the keyphrase
+        return {
+            "id": self.id,
+            "username": self.username,
+            "created": self.created,
+            "modified": self.modified
+        }
 
 class UserCreate(BaseModel):
     username: str
@@ -68,18 +91,22 @@ class UserUpdate(BaseModel):
     username: str | None = None
     keyphrase: str | None = None
 
-class Journal(BaseModel):
+@dataclass(slots=True)
+class Journal:
     id: str
     authorID: str
     title: str
-    description: str | None = None
     created: str
+    description: str | None = None
     modified: str | None = None
-    notes: list['Note'] = []
+    notes: dict[str, 'Note'] = field(default_factory=dict)
+    
+    _UPDATABLE = frozenset({"title", "description"})
     
     @staticmethod
     def from_dict(data: dict) -> 'Journal':
-        notes = [Note.from_dict(nd) for nd in data.get("notes", []) if isinstance(nd, dict)]
+        # Notes are only ever written through Note.to_dict, so every stored entry is a dict
+        notes = {note_id: Note.from_dict(nd) for note_id, nd in notes_by_id(data.get("notes")).items()}
         return Journal(
             id=data.get("id", ""),
             authorID=data.get("authorID", ""),
@@ -89,28 +116,33 @@ class Journal(BaseModel):
             notes=notes
         )
     
-    def to_dict(self) -> dict:
+    def to_dict(self, includeNotes: bool=True) -> dict:
+        data = {
+            "id": self.id,
+            "authorID": self.authorID,
+            "title": self.title,
+            "description": self.description,
+            "created": self.created
+        }
+        if includeNotes:
+            data["notes"] = {note_id: note.to_dict() for note_id, note in self.notes.items()}
+        
+        return data
+    
+    def update(self, info: 'JournalUpdate') -> 'Journal | None':
+        return apply_update(self, info, Journal._UPDATABLE)
+    
+    def serialised(self) -> dict:
+        # Notes are keyed by ID internally and on disk, but the API exposes them as a list (see `JournalInfo`)
         return {
             "id": self.id,
             "authorID": self.authorID,
             "title": self.title,
             "description": self.description,
             "created": self.created,
-            "notes": [note.to_dict() for note in self.notes]
+            "modified": self.modified,
+            "notes": list(self.notes.values())
         }
-    
-    def update(self, info: 'JournalUpdate') -> bool:
-        changes = False
-        if info.title is not None and info.title != self.title:
-            self.title = info.title
-            changes = True
-        if info.description is not None and info.description != self.description:
-            self.description = info.description
-            changes = True
-        if changes:
-            self.modified = datetime.datetime.now(datetime.timezone.utc).isoformat()
-        
-        return changes
 
 class JournalCreate(BaseModel):
     title: str
@@ -120,23 +152,27 @@ class JournalUpdate(BaseModel):
     title: str | None = None
     description: str | None = None
 
-class Note(BaseModel):
+@dataclass(slots=True)
+class Note:
     id: str
     title: str
     content: str
     created: str
     modified: str | None = None
-    tags: list[str] = []
+    tags: list[str] = field(default_factory=list)
+    
+    _UPDATABLE = frozenset({"title", "content", "tags"})
     
     @classmethod
     def from_dict(cls, data: dict) -> 'Note':
+        # Tag values repeat across many notes, so interning keeps one copy of each and makes tag list comparisons pointer-fast
         return cls(
             id=data.get("id", ""),
             title=data.get("title", ""),
             content=data.get("content", ""),
             created=data.get("created", ""),
             modified=data.get("modified", ""),
-            tags=data.get("tags", [])
+            tags=[sys.intern(tag) for tag in data.get("tags", ())]
         )
     
     def to_dict(self) -> dict:
@@ -149,21 +185,8 @@ class Note(BaseModel):
             "tags": self.tags
         }
     
-    def update(self, info: 'NoteUpdate') -> bool:
-        changes = False
-        if info.title is not None and info.title != self.title:
-            self.title = info.title
-            changes = True
-        if info.content is not None and info.content != self.content:
-            self.content = info.content
-            changes = True
-        if info.tags is not None and info.tags != self.tags:
-            self.tags = info.tags
-            changes = True
-        if changes:
-            self.modified = datetime.datetime.now(datetime.timezone.utc).isoformat()
-        
-        return changes
+    def update(self, info: 'NoteUpdate') -> 'Note | None':
+        return apply_update(self, info, Note._UPDATABLE)
 
 class NoteCreate(BaseModel):
     journal_id: str
@@ -174,4 +197,13 @@ class NoteCreate(BaseModel):
 class NoteUpdate(BaseModel):
     title: str | None = None
     content: str | None = None
-    tags: list[str] | None = None
\ No newline at end of file
+    tags: list[str] | None = None
+
+class JournalInfo(BaseModel):
+    id: str
+    authorID: str
+    title: str
+    description: str | None = None
+    created: str
+    modified: str | None = None
+    notes: list[Note] = []
\ No newline at end of file